@@ -4,8 +4,9 @@ Simple HTTP server launcher for the Document AI Dataset Viewer interface.
 This script starts a local web server to serve the HTML interface and PDFs.
 """
 
+import gzip
 import http.server
-import socketserver
+import shutil
 import webbrowser
 import os
 import sys
@@ -13,19 +14,133 @@ from pathlib import Path
 
 class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """Custom handler to serve the interface by default"""
-    
+
+    # Memoized ".html rewrite" decisions for extension-less paths, so
+    # repeated hits on the same URL cost one dict lookup instead of a stat.
+    # Only positive hits are cached (a .html file created later is picked
+    # up on the next request) and the cache is capped so arbitrary URLs
+    # can't grow it without bound
+    _exists_cache = {}
+    _EXISTS_CACHE_MAX = 1024
+
     def do_GET(self):
         # If requesting the root path, serve the interface/index.html
         if self.path == '/' or self.path == '':
             self.path = '/interface/index.html'
+        # Map /shard/<N>.jsonl onto the paginated shards the parser writes,
+        # so the interface can fetch one small page of documents at a time
+        elif self.path.startswith('/shard/'):
+            self.path = '/output/shards/' + self.path[len('/shard/'):]
         # If requesting a path without extension and no file exists, try adding .html
-        elif '.' not in self.path.split('/')[-1]:
-            test_path = self.path.rstrip('/') + '.html'
-            if os.path.exists('.' + test_path):
-                self.path = test_path
-        
+        elif '.' not in self.path.rpartition('/')[2]:
+            cache = self._exists_cache
+            rewrite = cache.get(self.path)
+            if rewrite is None:
+                test_path = self.path.rstrip('/') + '.html'
+                if os.path.exists('.' + test_path):
+                    if len(cache) >= self._EXISTS_CACHE_MAX:
+                        cache.clear()
+                    cache[self.path] = rewrite = test_path
+            if rewrite is not None:
+                self.path = rewrite
+
+        if self.serve_gzip_sidecar():
+            return
+
         return super().do_GET()
 
+    def end_headers(self):
+        # Shards are immutable per parser run; let the browser cache them
+        if self.path.startswith('/output/shards/'):
+            self.send_header('Cache-Control', 'public, max-age=86400, immutable')
+        super().end_headers()
+
+    def serve_gzip_sidecar(self):
+        """
+        Serve a precomputed .gz sidecar when the client accepts gzip.
+
+        The dataset JSON compresses ~5-10x, and the interface reloads it on
+        every refresh; serving the sidecar cuts that much off the wire. A
+        stale sidecar (older than its source) is ignored, and requests with
+        a Range header fall through so byte offsets stay consistent.
+        """
+        if 'gzip' not in self.headers.get('Accept-Encoding', ''):
+            return False
+        if self.headers.get('Range') is not None:
+            return False
+
+        file_path = self.translate_path(self.path)
+        gz_path = file_path + '.gz'
+        try:
+            gz_stat = os.stat(gz_path)
+            src_stat = os.stat(file_path)
+        except OSError:
+            return False
+        if gz_stat.st_mtime < src_stat.st_mtime:
+            return False
+
+        try:
+            f = open(gz_path, 'rb')
+        except OSError:
+            return False
+
+        # From here on the request counts as handled: once the status line
+        # has been sent, falling back to do_GET would write a second
+        # response onto a half-written connection
+        with f:
+            self.send_response(200)
+            self.send_header('Content-Type', self.guess_type(file_path))
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(gz_stat.st_size))
+            self.send_header('Last-Modified',
+                             self.date_time_string(int(src_stat.st_mtime)))
+            self.end_headers()
+            try:
+                shutil.copyfileobj(f, self.wfile)
+            except OSError:
+                pass  # client disconnected mid-body
+        return True
+
+def ensure_gzip_sidecar(file_path):
+    """Precompute <file>.gz next to the given file if missing or stale."""
+    try:
+        src_stat = os.stat(file_path)
+    except OSError:
+        return
+
+    gz_path = str(file_path) + '.gz'
+    try:
+        if os.stat(gz_path).st_mtime >= src_stat.st_mtime:
+            return  # sidecar is up to date
+    except OSError:
+        pass
+
+    print(f"🗜️  Compressing {os.path.basename(file_path)} for gzip delivery...")
+    with open(file_path, 'rb') as f_in, \
+         gzip.open(gz_path, 'wb', compresslevel=6) as f_out:
+        shutil.copyfileobj(f_in, f_out)
+
+def scan_names(directory):
+    """
+    Return the set of entry names in a directory, or None if it's missing.
+
+    One scandir reads the whole listing from a single getdents pass, so
+    the startup checks don't issue a stat() per file (noticeable on
+    network filesystems or PDF directories with thousands of entries).
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+def count_pdfs(pdfs_dir):
+    """Count PDF files using the stat info cached on each DirEntry."""
+    with os.scandir(pdfs_dir) as entries:
+        return sum(1 for entry in entries
+                   if entry.name.endswith('.pdf')
+                   and entry.is_file(follow_symlinks=False))
+
 def main():
     # Configuration
     PORT = 8000
@@ -42,25 +157,29 @@ def main():
     print(f"Interface available at: http://{HOST}:{PORT}/interface/")
     print()
     
-    # Check if demo data exists
-    demo_file = parent_dir / 'interface' / 'demo-data.json'
-    main_data_file = parent_dir / 'output' / 'layout_dataset.json'
+    # Check if demo data exists - one directory listing per location
+    # instead of a stat() per file
+    output_names = scan_names(parent_dir / 'output') or set()
+    interface_names = scan_names(parent_dir / 'interface') or set()
     pdfs_dir = parent_dir / 'PDFs'
-    
-    if main_data_file.exists():
+
+    if 'layout_dataset.json' in output_names:
         print("✅ Main dataset found: output/layout_dataset.json")
-    elif demo_file.exists():
+        ensure_gzip_sidecar(parent_dir / 'output' / 'layout_dataset.json')
+        if 'layout_dataset.json' in interface_names:
+            ensure_gzip_sidecar(parent_dir / 'interface' / 'layout_dataset.json')
+    elif 'demo-data.json' in interface_names:
         print("📋 Using demo data for testing")
         print("   Run 'python parser.py' to generate real data")
     else:
         print("⚠️  No dataset files found")
         print("   - Run 'python parser.py' to generate data")
         print("   - Or ensure demo-data.json exists for testing")
-    
-    if pdfs_dir.exists():
-        pdf_count = len(list(pdfs_dir.glob('*.pdf')))
+
+    try:
+        pdf_count = count_pdfs(pdfs_dir)
         print(f"📁 Found {pdf_count} PDF files in PDFs/ directory")
-    else:
+    except (FileNotFoundError, NotADirectoryError):
         print("⚠️  PDFs directory not found")
     
     print()
@@ -84,7 +203,10 @@ def main():
     })
     
     try:
-        with socketserver.TCPServer((HOST, PORT), handler) as httpd:
+        # ThreadingHTTPServer handles each connection on its own thread, so
+        # a large PDF download no longer stalls the JSON/CSS/other-PDF
+        # requests behind it
+        with http.server.ThreadingHTTPServer((HOST, PORT), handler) as httpd:
             print(f"Server started at http://{HOST}:{PORT}")
             
             # Try to open browser automatically to the interface
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Shared Document AI client cache for the helper scripts.
+
+Every helper used to build its own DocumentProcessorServiceClient, and
+each construction opens a TLS/gRPC channel and reloads credentials
+(hundreds of ms). Clients are cheap to share and thread-safe, so one
+per (location, service account) is enough for the whole process.
+"""
+
+import functools
+
+
+@functools.lru_cache(maxsize=8)
+def endpoint(location):
+    """Regional API endpoint for a processor location."""
+    return f"{location}-documentai.googleapis.com"
+
+
+@functools.lru_cache(maxsize=32)
+def processor_path(project_id, location, processor_id):
+    """Full processor resource path, formatted and validated once."""
+    from google.cloud import documentai
+    return documentai.DocumentProcessorServiceClient.processor_path(
+        project_id, location, processor_id)
+
+
+@functools.lru_cache(maxsize=8)
+def load_credentials(service_account_path):
+    """Parse a service-account key file once per path and reuse it."""
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_file(
+        service_account_path)
+
+
+@functools.lru_cache(maxsize=8)
+def get_client(location, service_account_path=None):
+    """
+    Return a cached DocumentProcessorServiceClient for the location.
+
+    Credentials are loaded explicitly and passed to the constructor -
+    mutating GOOGLE_APPLICATION_CREDENTIALS would leak across threads
+    and make google-auth re-read and re-parse the key per client.
+
+    Args:
+        location: Processor location (e.g. 'us' or 'eu')
+        service_account_path: Optional service account JSON path
+
+    Returns:
+        A DocumentProcessorServiceClient bound to the regional endpoint
+    """
+    # Imported here so merely importing the cache stays instant
+    from google.cloud import documentai
+    from google.api_core.client_options import ClientOptions
+
+    credentials = (load_credentials(service_account_path)
+                   if service_account_path else None)
+
+    return documentai.DocumentProcessorServiceClient(
+        client_options=ClientOptions(api_endpoint=endpoint(location)),
+        credentials=credentials
+    )
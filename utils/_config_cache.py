@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Cached configuration and service-account loading for the helper scripts.
+
+Each helper used to redo the config_local-then-config import dance and
+re-read + re-parse the service account JSON on every call. Both results
+are effectively immutable for the life of a run, so they are loaded
+once: the config via lru_cache, the service-account file keyed on its
+mtime so an edited key file is picked up without restarting.
+"""
+
+import json
+import os
+import sys
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+Config = namedtuple(
+    "Config",
+    ["PROJECT_ID", "LOCATION", "PROCESSOR_ID", "SERVICE_ACCOUNT_PATH",
+     "source"])
+
+# (path, mtime) -> parsed service-account dict
+_sa_cache = {}
+
+
+@lru_cache(maxsize=1)
+def load_config():
+    """
+    Load configuration from config_local.py, falling back to config.py.
+
+    Returns:
+        A Config namedtuple, or None when neither module can be imported.
+        The `source` field names the module the values came from.
+    """
+    # The helpers run both from the repo root and from utils/; make sure
+    # the repo root is importable either way
+    root = str(Path(__file__).parent.parent)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+
+    try:
+        from config_local import (PROJECT_ID, LOCATION, PROCESSOR_ID,
+                                  SERVICE_ACCOUNT_PATH)
+        source = "config_local.py"
+    except ImportError:
+        try:
+            from config import (PROJECT_ID, LOCATION, PROCESSOR_ID,
+                                SERVICE_ACCOUNT_PATH)
+            source = "config.py"
+        except ImportError:
+            return None
+
+    return Config(PROJECT_ID, LOCATION, PROCESSOR_ID, SERVICE_ACCOUNT_PATH,
+                  source)
+
+
+def load_sa(path):
+    """
+    Return the parsed service-account JSON for `path`.
+
+    The parse is cached keyed on (path, mtime): repeat diagnostic passes
+    hit the cache, while touching the file invalidates it.
+    """
+    key = (path, os.stat(path).st_mtime)
+    data = _sa_cache.get(key)
+    if data is None:
+        data = json.loads(Path(path).read_bytes())
+        # Drop only stale mtimes of this file; other paths (e.g. the SA
+        # files of other configs in a --configs run) stay cached
+        for stale in [k for k in _sa_cache if k[0] == path]:
+            del _sa_cache[stale]
+        _sa_cache[key] = data
+    return data
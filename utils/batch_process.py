@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Batch-process PDFs through Document AI's asynchronous batch endpoint.
+
+One batch_process_documents call covers a whole directory of PDFs: the
+files are staged to a GCS bucket once, Google fans the work out server
+side, and a single long-running operation replaces one synchronous RPC
+round-trip per document. Use this instead of looping process_document
+whenever there is more than one file to process.
+"""
+
+import os
+import re
+import sys
+from pathlib import Path
+
+from google.cloud import documentai
+from google.api_core.client_options import ClientOptions
+
+
+def batch_process(pdf_paths, bucket_name, processor_name, project_id,
+                  gcs_input_prefix="docai-batch/input",
+                  gcs_output_prefix="docai-batch/output",
+                  timeout=1800, cleanup=True, credentials=None):
+    """
+    Process many PDFs with a single batch_process_documents operation.
+
+    Args:
+        pdf_paths: Iterable of local PDF paths
+        bucket_name: GCS bucket used for staging input and output
+        processor_name: Full processor resource path
+        project_id: Google Cloud project ID (for the storage client)
+        gcs_input_prefix: Bucket prefix the PDFs are uploaded under
+        gcs_output_prefix: Bucket prefix Document AI writes results under
+        timeout: Seconds to wait for the long-running operation
+        cleanup: Delete the staged input and output blobs afterwards
+        credentials: Optional explicit credentials for both clients
+
+    Returns:
+        Dict mapping each PDF's file name to its list of parsed
+        documentai.Document shards (in shard order)
+    """
+    from google.cloud import storage  # deferred: only this path needs GCS
+
+    pdf_paths = [str(p) for p in pdf_paths]
+    if not pdf_paths:
+        return {}
+
+    storage_client = storage.Client(project=project_id,
+                                    credentials=credentials)
+    bucket = storage_client.bucket(bucket_name)
+
+    # Stage every PDF once; per-file upload cost is paid here instead of
+    # inflating each RPC body with inline base64 content
+    gcs_documents = []
+    input_blobs = []
+    for pdf_path in pdf_paths:
+        file_name = os.path.basename(pdf_path)
+        blob = bucket.blob(f"{gcs_input_prefix}/{file_name}")
+        print(f"⬆️  Staging {file_name} to gs://{bucket_name}/{blob.name}")
+        blob.upload_from_filename(pdf_path)
+        input_blobs.append(blob)
+        gcs_documents.append(documentai.GcsDocument(
+            gcs_uri=f"gs://{bucket_name}/{blob.name}",
+            mime_type="application/pdf"
+        ))
+
+    request = documentai.BatchProcessRequest(
+        name=processor_name,
+        input_documents=documentai.BatchDocumentsInputConfig(
+            gcs_documents=documentai.GcsDocuments(documents=gcs_documents)
+        ),
+        document_output_config=documentai.DocumentOutputConfig(
+            gcs_output_config=documentai.DocumentOutputConfig.GcsOutputConfig(
+                gcs_uri=f"gs://{bucket_name}/{gcs_output_prefix}/"
+            )
+        )
+    )
+
+    endpoint = processor_name.split("/locations/")[1].split("/")[0]
+    client = documentai.DocumentProcessorServiceClient(
+        client_options=ClientOptions(
+            api_endpoint=f"{endpoint}-documentai.googleapis.com"),
+        credentials=credentials
+    )
+
+    print(f"⏳ Waiting for batch operation on {len(pdf_paths)} PDFs...")
+    operation = client.batch_process_documents(request=request)
+    operation.result(timeout=timeout)
+
+    # Each input produces one output folder of JSON shards; group the
+    # shards back under their source file name. list_blobs returns names
+    # lexicographically ("...-10.json" before "...-2.json"), so order by
+    # the numeric shard suffix to keep each file's shards in shard order
+    results = {}
+    output_blobs = list(storage_client.list_blobs(
+        bucket_name, prefix=f"{gcs_output_prefix}/"))
+
+    def shard_index(blob):
+        match = re.search(r"(\d+)\.json$", blob.name)
+        return (int(match.group(1)) if match else 0, blob.name)
+
+    for blob in sorted(output_blobs, key=shard_index):
+        if not blob.name.endswith(".json"):
+            continue
+        shard = documentai.Document.from_json(
+            blob.download_as_bytes(), ignore_unknown_fields=True)
+        # Output paths look like <prefix>/<operation>/<input-index>/...json;
+        # match them to inputs by the shard's source URI when present,
+        # otherwise by folder order
+        folder = blob.name[len(gcs_output_prefix) + 1:].split("/")
+        try:
+            index = int(folder[1])
+            file_name = os.path.basename(pdf_paths[index])
+        except (IndexError, ValueError):
+            file_name = folder[-1]
+        results.setdefault(file_name, []).append(shard)
+
+    if cleanup:
+        for blob in input_blobs:
+            blob.delete()
+        for blob in output_blobs:
+            blob.delete()
+
+    print(f"✅ Batch processing complete: {len(results)} documents")
+    return results
+
+
+def main():
+    """Batch-process every PDF in PDFs/ using the configured processor."""
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    try:
+        from config import (PROJECT_ID, LOCATION, PROCESSOR_ID,
+                            SERVICE_ACCOUNT_PATH)
+    except ImportError:
+        print("❌ Could not import configuration")
+        return
+
+    bucket_name = os.environ.get("DOCAI_STAGING_BUCKET")
+    if not bucket_name:
+        print("❌ Set DOCAI_STAGING_BUCKET to the GCS bucket to stage through")
+        return
+
+    pdf_paths = sorted(Path("PDFs").glob("*.pdf"))
+    if not pdf_paths:
+        print("❌ No PDF files found in PDFs directory")
+        return
+
+    from _client_cache import load_credentials, processor_path
+    credentials = (load_credentials(SERVICE_ACCOUNT_PATH)
+                   if SERVICE_ACCOUNT_PATH else None)
+    processor_name = processor_path(PROJECT_ID, LOCATION, PROCESSOR_ID)
+    results = batch_process(pdf_paths, bucket_name, processor_name, PROJECT_ID,
+                            credentials=credentials)
+    for file_name, shards in results.items():
+        pages = sum(len(shard.pages) for shard in shards)
+        print(f"   {file_name}: {pages} pages in {len(shards)} shard(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,15 @@
 Check PDF File Validity
 """
 
+import mmap
 import os
+import re
 from pathlib import Path
 
+# All body markers found in one scan of the file instead of one full
+# Boyer-Moore pass per marker (the file may be tens of MB)
+_MARKERS = re.compile(b'/Encrypt|xref|trailer')
+
 def check_pdf_file(pdf_path):
     """Check if a PDF file is valid and readable."""
     print(f"🔍 Checking PDF: {pdf_path}")
@@ -15,34 +21,43 @@ def check_pdf_file(pdf_path):
         return False
     
     try:
+        # Memory-map the file: the checks below read straight from the
+        # page cache without copying the whole file into a bytes object.
+        # mmap rejects zero-length files, so size-check via fstat first.
         with open(pdf_path, "rb") as f:
-            content = f.read()
-        
-        file_size = len(content)
-        print(f"   File size: {file_size:,} bytes ({file_size/1024/1024:.1f} MB)")
-        
-        # Check if it starts with PDF header
-        if content.startswith(b'%PDF-'):
-            print("✅ File has valid PDF header")
-        else:
-            print("❌ File doesn't have valid PDF header")
-            print(f"   First 20 bytes: {content[:20]}")
-            return False
-        
-        # Check if it ends properly
-        if b'%%EOF' in content[-1024:]:  # EOF should be near the end
-            print("✅ File has proper PDF ending")
-        else:
-            print("⚠️  File might not have proper PDF ending")
-        
+            file_size = os.fstat(f.fileno()).st_size
+            print(f"   File size: {file_size:,} bytes ({file_size/1024/1024:.1f} MB)")
+            if file_size == 0:
+                print("❌ File is empty")
+                return False
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        with mm:
+
+            # Check if it starts with PDF header
+            if mm[:5] == b'%PDF-':
+                print("✅ File has valid PDF header")
+            else:
+                print("❌ File doesn't have valid PDF header")
+                print(f"   First 20 bytes: {mm[:20]}")
+                return False
+
+            # Check if it ends properly (EOF should be near the end)
+            if mm.rfind(b'%%EOF', max(0, file_size - 1024)) != -1:
+                print("✅ File has proper PDF ending")
+            else:
+                print("⚠️  File might not have proper PDF ending")
+
+            hits = set(_MARKERS.findall(mm))
+
         # Check for password protection
-        if b'/Encrypt' in content:
+        if b'/Encrypt' in hits:
             print("⚠️  PDF might be password protected")
         else:
             print("✅ PDF is not password protected")
         
         # Basic structure check
-        if b'xref' in content and b'trailer' in content:
+        if b'xref' in hits and b'trailer' in hits:
             print("✅ PDF has basic structure elements")
         else:
             print("⚠️  PDF might have structural issues")
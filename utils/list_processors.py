@@ -2,53 +2,107 @@
 """
 List Document AI Processors
 This script lists all processors in your project to verify IDs.
+
+Processor metadata changes rarely, so results are cached on disk for an
+hour (~/.cache/docai_processors.json); pass --refresh to force a
+control-plane call.
 """
 
+import json
 import os
-from google.cloud import documentai
-from google.api_core.client_options import ClientOptions
+import sys
+import time
 
-def list_processors():
-    """List all processors in the project."""
+from _client_cache import get_client
+
+# Disk cache of processor listings per project/location; one hour is
+# short enough that a newly created processor shows up promptly
+_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache",
+                           "docai_processors.json")
+_CACHE_TTL = 3600
+
+def _read_cache():
+    """Return the whole on-disk cache dict (empty on any problem)."""
     try:
-        from config import PROJECT_ID, LOCATION, SERVICE_ACCOUNT_PATH
-    except ImportError:
+        with open(_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def get_cached_processors(project_id, location):
+    """Return the cached processor list if present and fresh, else None."""
+    entry = _read_cache().get(f"{project_id}/{location}")
+    if entry and time.time() - entry.get("timestamp", 0) < _CACHE_TTL:
+        return entry["processors"]
+    return None
+
+def store_cached_processors(project_id, location, processors):
+    """Persist a processor listing for later runs."""
+    cache = _read_cache()
+    cache[f"{project_id}/{location}"] = {
+        "timestamp": time.time(),
+        "processors": processors,
+    }
+    try:
+        os.makedirs(os.path.dirname(_CACHE_PATH), exist_ok=True)
+        with open(_CACHE_PATH, "w") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass  # caching is best-effort; never fail the listing over it
+
+def list_processors(refresh=False):
+    """List all processors in the project."""
+    from _config_cache import load_config
+    config = load_config()
+    if config is None:
         print("❌ Could not import configuration")
         return
+    PROJECT_ID = config.PROJECT_ID
+    LOCATION = config.LOCATION
+    SERVICE_ACCOUNT_PATH = config.SERVICE_ACCOUNT_PATH
     
     print(f"🔍 Listing processors in project: {PROJECT_ID}")
     print(f"   Location: {LOCATION}")
     
     try:
-        # Set up authentication
-        if SERVICE_ACCOUNT_PATH:
-            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = SERVICE_ACCOUNT_PATH
-        
-        # Initialize client
-        opts = ClientOptions(api_endpoint=f"{LOCATION}-documentai.googleapis.com")
-        client = documentai.DocumentProcessorServiceClient(client_options=opts)
-        
-        # List processors
-        parent = f"projects/{PROJECT_ID}/locations/{LOCATION}"
-        
-        print(f"   Requesting processors from: {parent}")
-        
-        processors = client.list_processors(parent=parent)
-        
+        entries = None if refresh else get_cached_processors(PROJECT_ID, LOCATION)
+        if entries is not None:
+            print("   (cached; pass --refresh to query the API)")
+        else:
+            # Shared cached client - see utils/_client_cache.py
+            client = get_client(LOCATION, SERVICE_ACCOUNT_PATH)
+
+            # List processors; ask for large pages so projects with many
+            # processors need one round-trip instead of several
+            from google.cloud import documentai
+            parent = f"projects/{PROJECT_ID}/locations/{LOCATION}"
+
+            print(f"   Requesting processors from: {parent}")
+
+            request = documentai.ListProcessorsRequest(
+                parent=parent, page_size=100)
+            entries = [
+                {
+                    "id": processor.name.split('/')[-1],
+                    "display_name": processor.display_name,
+                    "type": str(processor.type_),
+                    "state": str(processor.state),
+                    "name": processor.name,
+                }
+                for processor in client.list_processors(request=request)
+            ]
+            store_cached_processors(PROJECT_ID, LOCATION, entries)
+
         print("✅ Available processors:")
-        found_processors = False
-        for processor in processors:
-            found_processors = True
-            # Extract processor ID from the full name
-            processor_id = processor.name.split('/')[-1]
-            print(f"   ID: {processor_id}")
-            print(f"   Name: {processor.display_name}")
-            print(f"   Type: {processor.type_}")
-            print(f"   State: {processor.state}")
-            print(f"   Full path: {processor.name}")
+        for entry in entries:
+            print(f"   ID: {entry['id']}")
+            print(f"   Name: {entry['display_name']}")
+            print(f"   Type: {entry['type']}")
+            print(f"   State: {entry['state']}")
+            print(f"   Full path: {entry['name']}")
             print("-" * 40)
         
-        if not found_processors:
+        if not entries:
             print("⚠️  No processors found in this project/location")
             print("   You may need to:")
             print("   1. Create a processor in the Google Cloud Console")
@@ -63,4 +117,4 @@ def list_processors():
             print("   💡 This is the same permission error - your service account needs permissions")
 
 if __name__ == "__main__":
-    list_processors() 
\ No newline at end of file
+    list_processors(refresh="--refresh" in sys.argv[1:]) 
\ No newline at end of file
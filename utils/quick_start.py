@@ -23,10 +23,10 @@ def check_dependencies():
         return False
     
     try:
-        import pandas
-        print("✅ Pandas is installed")
+        import orjson
+        print("✅ orjson is installed")
     except ImportError:
-        print("❌ Pandas not found")
+        print("❌ orjson not found")
         print("   Please run: pip install -r requirements.txt")
         return False
     